@@ -0,0 +1,56 @@
+"""Example queries shown in the UI, shared by the server and the Streamlit app.
+
+This module is the only writer of `assets/examples_vectors.npz`, a binary cache of
+`assets/examples_vectors.json`, rebuilt whenever the JSON is newer than the cache.
+"""
+import os
+import tempfile
+from typing import Dict, List, Tuple
+
+import numpy as np
+import orjson
+
+_assets_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+_by_language_path = os.path.join(_assets_dir, "examples_by_language.json")
+_vectors_path = os.path.join(_assets_dir, "examples_vectors.json")
+_vectors_cache_path = os.path.join(_assets_dir, "examples_vectors.npz")
+
+
+def load_examples_by_language() -> Dict[str, List[str]]:
+    """Example queries, grouped by the flag of their language"""
+    with open(_by_language_path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def load_examples_vectors() -> Tuple[List[str], np.ndarray]:
+    """Example queries and a `float32` matrix of their precomputed embeddings, row by row"""
+    if os.path.exists(_vectors_cache_path) and os.path.getmtime(
+        _vectors_cache_path
+    ) >= os.path.getmtime(_vectors_path):
+        with np.load(_vectors_cache_path) as f:
+            names = f["names"].tolist()
+            matrix = np.ascontiguousarray(f["vectors"], dtype=np.float32)
+        return names, matrix
+
+    with open(_vectors_path, "rb") as f:
+        raw = orjson.loads(f.read())
+    names = list(raw)
+    matrix = np.ascontiguousarray(
+        np.array([np.ravel(raw[name]) for name in names], dtype=np.float32)
+    )
+
+    # Write to a unique temporary file first, so concurrent readers never see a partial
+    # cache, and treat the cache as optional if the `assets` directory is read-only
+    temporary_path = None
+    try:
+        descriptor, temporary_path = tempfile.mkstemp(
+            suffix=".npz", prefix="examples_vectors.", dir=_assets_dir
+        )
+        with os.fdopen(descriptor, "wb") as f:
+            np.savez(f, names=np.array(names), vectors=matrix)
+        os.replace(temporary_path, _vectors_cache_path)
+    except OSError as e:
+        print(f"Will not cache the example vectors: {e}")
+        if temporary_path is not None and os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    return names, matrix
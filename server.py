@@ -1,42 +1,232 @@
 import os
 import re
 import io
+import math
 import base64
-from typing import List
-from dataclasses import dataclass
+import threading
+import functools
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
 
 import numpy as np
+import torch
 from PIL import Image
 
 from stringzilla import File, Strs
 from ucall.rich_posix import Server
-from usearch.index import Index, MetricKind, Matches
-from usearch.io import load_matrix
+from usearch.index import Index, MetricKind, ScalarKind, Matches
+from usearch.io import load_matrix, save_matrix
 from usearch.server import _ascii_to_vector
 from uform import get_model
 
+from examples import load_examples_by_language, load_examples_vectors
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+except ImportError:
+    ort = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# When pinned with `numactl`, only the CPUs of that node may run our threads
+_cpus = (
+    len(os.sched_getaffinity(0))
+    if hasattr(os, "sched_getaffinity")
+    else (os.cpu_count() or 1)
+)
+
+# Hyper-threads share the FMA units, so using more threads than physical cores
+# only adds contention; every query is a single forward pass anyway.
+torch.set_num_threads(max(1, _cpus // 2))
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:
+    # Can only be set before the first inter-op parallel work, e.g. if imported late
+    pass
+
+
+def _aligned_empty(shape, dtype=np.float32, alignment: int = 64) -> np.ndarray:
+    """Allocates an uninitialized C-contiguous array, starting at an `alignment`-byte boundary"""
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buffer = np.empty(nbytes + alignment, dtype=np.uint8)
+    offset = -buffer.ctypes.data % alignment
+    return buffer[offset : offset + nbytes].view(dtype).reshape(shape)
+
+
+@dataclass
+class _Query:
+    vector: np.ndarray
+    count: int
+    expansion: int
+    done: threading.Event = field(default_factory=threading.Event)
+    matches: Optional[Matches] = None
+    error: Optional[BaseException] = None
+
+
+class _SearchBatcher:
+    """Coalesces concurrent single-vector searches into batched `Index.search` calls.
+
+    A lone query is searched immediately. When others are already in flight,
+    queries wait for up to `window` seconds, or until `max_batch` of them queue up,
+    and are then stacked into one matrix, letting USearch parallelize internally.
+    Queries with different `expansion` factors are searched in separate calls.
+    """
+
+    def __init__(self, index: Index, max_batch: int = 32, window: float = 0.002):
+        self.index = index
+        self.max_batch = max_batch
+        self.window = window
+        self._condition = threading.Condition()
+        self._queue: List[_Query] = []
+        self._active = 0
+        # The search expansion is a property of the whole index
+        self._index_lock = threading.Lock()
+
+    def _search(self, vectors: np.ndarray, count: int, expansion: int, **kwargs):
+        with self._index_lock:
+            if self.index.expansion_search != expansion:
+                self.index.expansion_search = expansion
+            return self.index.search(vectors, count, **kwargs)
+
+    def search(self, vector: np.ndarray, count: int, expansion: int) -> Matches:
+        with self._condition:
+            alone = self._active == 0
+            self._active += 1
+        try:
+            if alone:
+                return self._search(vector, count, expansion)
+
+            query = _Query(vector=vector, count=count, expansion=expansion)
+            batch = None
+            with self._condition:
+                self._queue.append(query)
+                if len(self._queue) == 1:
+                    # The first query in the queue leads the batch
+                    self._condition.wait_for(
+                        lambda: len(self._queue) >= self.max_batch,
+                        timeout=self.window,
+                    )
+                    batch, self._queue = self._queue, []
+                elif len(self._queue) >= self.max_batch:
+                    self._condition.notify_all()
+
+            if batch is not None:
+                self._search_batch(batch)
+            query.done.wait()
+            if query.error is not None:
+                raise query.error
+            return query.matches
+        finally:
+            with self._condition:
+                self._active -= 1
+
+    def _search_batch(self, batch: List[_Query]) -> None:
+        groups: Dict[int, List[_Query]] = {}
+        for query in batch:
+            groups.setdefault(query.expansion, []).append(query)
+
+        for expansion, group in groups.items():
+            try:
+                matrix = np.ascontiguousarray(np.stack([q.vector for q in group]))
+                count = max(q.count for q in group)
+                threads = min(len(group), _cpus)
+                matches = self._search(matrix, count, expansion, threads=threads)
+                for i, query in enumerate(group):
+                    query.matches = matches[i]
+            except BaseException as e:
+                for query in group:
+                    query.error = e
+            finally:
+                for query in group:
+                    query.done.set()
+
 
 @dataclass
 class Dataset:
     index: Index
     uris: Strs
     vectors: np.ndarray
+    batcher: _SearchBatcher
+    thumbnails: Optional[Strs] = None
+
+    def lookup(self, keys: np.ndarray) -> List[str]:
+        """URIs of the given `keys`, preferring thumbnails if those are available"""
+        uris = self.uris if self.thumbnails is None else self.thumbnails
+        return [str(uris[key]) for key in np.ravel(keys).tolist()]
+
+
+def _normalize_rows_numpy(vectors: np.ndarray) -> None:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+
+def _normalize_rows_numba(vectors: np.ndarray) -> None:
+    count, ndim = vectors.shape
+    for i in numba.prange(count):
+        norm = 0.0
+        for j in range(ndim):
+            norm += vectors[i, j] * vectors[i, j]
+        scale = 1.0 / (math.sqrt(norm) + 1e-12)
+        for j in range(ndim):
+            vectors[i, j] *= scale
+
+
+# A single parallel pass over the rows, instead of materializing all the norms first
+if numba is not None:
+    _normalize_rows = numba.njit(parallel=True, fastmath=True, cache=True)(
+        _normalize_rows_numba
+    )
+else:
+    _normalize_rows = _normalize_rows_numpy
+
+
+# The UI shows at most 80 results, which need far fewer graph hops than USearch defaults
+_default_expansion = 32
 
 
 def _open_dataset(dir: os.PathLike) -> Dataset:
     print(f"Loading dataset: {dir}")
-    vectors = load_matrix(
-        os.path.join(dir, "images.uform-vl-multilingual-v2.fbin"),
-        view=True,
+    if not os.path.exists(os.path.join(dir, "v2.3.0")):
+        os.mkdir(os.path.join(dir, "v2.3.0"))
+
+    # Unit-length vectors let us use the cheaper inner product instead of cosine,
+    # so we normalize the embeddings once and keep the normalized copy on disk.
+    vectors_path = os.path.join(
+        dir, "v2.3.0", "images.uform-vl-multilingual-v2.normalized.fbin"
     )
+    if not os.path.exists(vectors_path):
+        print("Will normalize the vectors!")
+        vectors = load_matrix(
+            os.path.join(dir, "images.uform-vl-multilingual-v2.fbin"),
+            view=False,
+        ).astype(np.float32, copy=False)
+        _normalize_rows(vectors)
+        save_matrix(vectors, vectors_path)
+
+    vectors = load_matrix(vectors_path, view=True)
     count = vectors.shape[0]
     ndim = vectors.shape[1]
     print(f"- loaded {count:,} x {ndim}-dimensional vectors")
-    index = Index(ndim=ndim, metric=MetricKind.Cos)
+    # Storing 8-bit integers instead of 32-bit floats makes every probe of the HNSW
+    # graph pull 4x less memory, at the cost of a small recall loss.
+    # The original `vectors` remain `float32` for any exact computations.
+    index = Index(
+        ndim=ndim,
+        metric=MetricKind.IP,
+        dtype=ScalarKind.I8,
+        connectivity=16,
+        expansion_add=64,
+        expansion_search=_default_expansion,
+    )
 
-    if not os.path.exists(os.path.join(dir, "v2.3.0")):
-        os.mkdir(os.path.join(dir, "v2.3.0"))
-    index_path = os.path.join(dir, "v2.3.0", "images.uform-vl-multilingual-v2.usearch")
+    index_path = os.path.join(
+        dir, "v2.3.0", "images.uform-vl-multilingual-v2.ip.i8.usearch"
+    )
     if os.path.exists(index_path):
         index.load(index_path)
 
@@ -46,27 +236,252 @@ def _open_dataset(dir: os.PathLike) -> Dataset:
         index.save(index_path)
 
     print(f"- loaded index for {len(index):,} x {index.ndim}-dimensional vectors")
+    print(f"- using {index.hardware_acceleration} SIMD kernels")
     assert count == len(index), "Number of vectors doesn't match"
     assert ndim == index.ndim, "Number of dimensions doesn't match"
     uris: Strs = File(os.path.join(dir, "images.txt")).splitlines()
     print(f"- loaded {len(uris):,} links")
 
+    # Optional small previews, generated offline with `thumbnails.py`
+    thumbnails: Optional[Strs] = None
+    thumbnails_path = os.path.join(dir, "images_thumb.txt")
+    if os.path.exists(thumbnails_path):
+        thumbnails = File(thumbnails_path).splitlines()
+        print(f"- loaded {len(thumbnails):,} thumbnails")
+        assert len(thumbnails) == len(uris), "Number of thumbnails doesn't match"
+
     return Dataset(
         index=index,
         uris=uris,
         vectors=vectors,
+        batcher=_SearchBatcher(index),
+        thumbnails=thumbnails,
     )
 
 
-_model = get_model("unum-cloud/uform-vl-multilingual-v2")
-_datasets = {
-    name: _open_dataset(os.path.join("/data", name))
-    for name in (
-        "unsplash-25k",
-        "cc-3m",
-        # "laion-4m",
-    )
-}
+# Same constants as in the UForm image preprocessing pipeline, scaled to `uint8` pixels
+_image_size = 224
+_image_mean = np.array([0.48145466, 0.4578275, 0.40821073], dtype=np.float32) * 255
+_image_std = np.array([0.26862954, 0.26130258, 0.27577711], dtype=np.float32) * 255
+_image_scale = (1 / _image_std).reshape(3, 1, 1)
+
+
+def _preprocess_image(image: Image.Image) -> torch.Tensor:
+    """Equivalent of `preprocess_image`, writing the normalized pixels in a single pass.
+
+    Follows the same steps and integer arithmetic as `torchvision` transforms used by UForm:
+    `Resize` of the shorter side, `CenterCrop`, and only then the conversion to RGB.
+    """
+    width, height = image.size
+    if width <= height:
+        size = (_image_size, int(_image_size * height / width))
+    else:
+        size = (int(_image_size * width / height), _image_size)
+    if image.size != size:
+        image = image.resize(size, Image.BICUBIC)
+
+    width, height = image.size
+    if (width, height) != (_image_size, _image_size):
+        left = int(round((width - _image_size) / 2.0))
+        top = int(round((height - _image_size) / 2.0))
+        image = image.crop((left, top, left + _image_size, top + _image_size))
+    image = image.convert("RGB")
+
+    pixels = np.asarray(image, dtype=np.uint8).transpose(2, 0, 1)
+    tensor = np.empty((1, *pixels.shape), dtype=np.float32)
+    np.subtract(pixels, _image_mean.reshape(3, 1, 1), out=tensor[0])
+    tensor *= _image_scale
+    return torch.from_numpy(tensor)
+
+
+class _Tower(torch.nn.Module):
+    """Exposes one of the encoders with positional tensor inputs for ONNX export.
+
+    The text encoder takes its tokens as a dictionary, the image encoder - a single tensor.
+    Both return a `(features, embeddings)` tuple, of which only the embeddings are exported.
+    """
+
+    def __init__(self, encoder: torch.nn.Module, input_names: List[str]):
+        super().__init__()
+        self.encoder = encoder
+        self.input_names = input_names
+
+    def forward(self, *inputs: torch.Tensor) -> torch.Tensor:
+        if len(inputs) == 1:
+            return self.encoder(inputs[0])[1]
+        return self.encoder(dict(zip(self.input_names, inputs)))[1]
+
+
+def _open_onnx_session(
+    name: str,
+    encoder: torch.nn.Module,
+    sample: Dict[str, torch.Tensor],
+) -> "ort.InferenceSession":
+    """Exports the encoder to ONNX with int8 weights once, and opens it for inference."""
+    if not os.path.exists(_onnx_dir):
+        os.makedirs(_onnx_dir)
+    path = os.path.join(_onnx_dir, f"{name}.v{_onnx_version}.int8.onnx")
+
+    if not os.path.exists(path):
+        print(f"Will export the {name} encoder to ONNX!")
+        input_names = list(sample.keys())
+        full_path = os.path.join(_onnx_dir, f"{name}.v{_onnx_version}.onnx")
+        dynamic_axes = {n: {0: "batch"} for n in input_names}
+        dynamic_axes["embeddings"] = {0: "batch"}
+        torch.onnx.export(
+            _Tower(encoder, input_names).eval(),
+            tuple(sample.values()),
+            full_path,
+            input_names=input_names,
+            output_names=["embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+        )
+        quantize_dynamic(full_path, path, weight_type=QuantType.QInt8)
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = _cpus
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+
+_model = get_model("unum-cloud/uform-vl-multilingual-v2").eval()
+_onnx_dir = os.path.join("/data", "uform-vl-multilingual-v2")
+# Bumped whenever the exported graph changes, so stale exports are never reused
+_onnx_version = 2
+_text_session = None
+_image_session = None
+if ort is not None:
+    try:
+        _text_session = _open_onnx_session(
+            "text",
+            _model.text_encoder,
+            dict(_model.preprocess_text("USearch for Images")),
+        )
+        _image_session = _open_onnx_session(
+            "image",
+            _model.image_encoder,
+            {
+                "images": _preprocess_image(
+                    Image.new("RGB", (_image_size, _image_size))
+                )
+            },
+        )
+    except Exception as e:
+        print(f"Will run the encoders with PyTorch, as ONNX export failed: {e}")
+        _text_session = None
+        _image_session = None
+
+_dataset_names = (
+    "unsplash-25k",
+    "cc-3m",
+    # "laion-4m",
+)
+_datasets: Dict[str, Dataset] = {}
+_datasets_lock = threading.Lock()
+
+
+def _get_dataset(name: str) -> Dataset:
+    """Opens the dataset on first use, so idle datasets cost no memory or startup time"""
+    dataset = _datasets.get(name)
+    if dataset is None:
+        if name not in _dataset_names:
+            raise KeyError(name)
+        with _datasets_lock:
+            dataset = _datasets.get(name)
+            if dataset is None:
+                dataset = _open_dataset(os.path.join("/data", name))
+                _datasets[name] = dataset
+    return dataset
+
+
+def _encode_text(text_data: Dict[str, torch.Tensor]) -> np.ndarray:
+    if _text_session is None:
+        # Calling the encoder module directly runs its `forward`, compiled or not
+        with torch.inference_mode():
+            return _model.text_encoder(text_data)[1].numpy()
+    inputs = {name: tensor.numpy() for name, tensor in text_data.items()}
+    return _text_session.run(None, inputs)[0]
+
+
+def _encode_image(image_data: torch.Tensor) -> np.ndarray:
+    if _image_session is None:
+        with torch.inference_mode():
+            return _model.image_encoder(image_data)[1].numpy()
+    return _image_session.run(None, {"images": image_data.numpy()})[0]
+
+
+def _compile_encoders() -> None:
+    """Fuses the kernels of PyTorch encoders, warming them up to pay the compilation cost now.
+
+    The CPU backend needs a working C++ toolchain, so on any failure we fall back to eager mode.
+    """
+    text_encoder, image_encoder = _model.text_encoder, _model.image_encoder
+    try:
+        _model.text_encoder = torch.compile(text_encoder)
+        _model.image_encoder = torch.compile(image_encoder)
+        _encode_text(_model.preprocess_text("USearch for Images"))
+        _encode_image(_preprocess_image(Image.new("RGB", (_image_size, _image_size))))
+    except Exception as e:
+        print(f"Will run the encoders eagerly, as compilation failed: {e}")
+        _model.text_encoder, _model.image_encoder = text_encoder, image_encoder
+
+
+# ONNX sessions are already optimized, and `torch.compile` is stable since 2.1
+_torch_version = tuple(int(part) for part in torch.__version__.split(".")[:2])
+if _text_session is None and _image_session is None and _torch_version >= (2, 1):
+    _compile_encoders()
+
+
+def _normalize(embedding: np.ndarray) -> np.ndarray:
+    """Read-only, unit-length `float32` copy of the `embedding`"""
+    embedding = embedding.astype(np.float32).ravel()
+    embedding /= np.linalg.norm(embedding) + 1e-12
+    embedding.setflags(write=False)
+    return embedding
+
+
+def _load_example_embeddings() -> Dict[str, np.ndarray]:
+    """Loads the embeddings of the example queries shown in the UI.
+
+    Examples missing from `examples_vectors.json` are embedded once at start.
+    """
+    names, vectors = load_examples_vectors()
+    examples = dict(zip(names, vectors))
+    for queries in load_examples_by_language().values():
+        for query in queries:
+            if query not in examples:
+                examples[query] = _encode_text(_model.preprocess_text(query))
+    return {" ".join(name.split()): _normalize(v) for name, v in examples.items()}
+
+
+_example_embeddings = _load_example_embeddings()
+
+
+@functools.lru_cache(maxsize=8192)
+def _embed_cached_text(query: str) -> np.ndarray:
+    return _normalize(_encode_text(_model.preprocess_text(query)))
+
+
+def _embed_text(query: str) -> np.ndarray:
+    """Normalized embedding of the `query` string, reusing the results for repeated queries"""
+    query = " ".join(query.split())
+    embedding = _example_embeddings.get(query)
+    if embedding is None:
+        embedding = _embed_cached_text(query)
+    return embedding
+
+
+_scratch = threading.local()
+
+
+def _get_scratch(ndim: int) -> np.ndarray:
+    """Aligned per-thread buffer for the query, reused across calls to skip allocations"""
+    buffer = getattr(_scratch, "buffer", None)
+    if buffer is None or buffer.shape[0] != ndim:
+        buffer = _aligned_empty(ndim, np.float32)
+        _scratch.buffer = buffer
+    return buffer
 
 
 def find_vector(
@@ -75,32 +490,38 @@ def find_vector(
     include_unsplash: bool = True,
     include_cc: bool = True,
     include_laion: bool = True,
+    expansion: int = _default_expansion,
+    normalized: bool = False,
 ) -> List[str]:
     uris_and_distances = []
-    vector = vector.flatten()
+    query = _get_scratch(vector.size)
+    np.copyto(query, np.ravel(vector))
+    if not normalized:
+        query /= np.linalg.norm(query) + 1e-12
+    vector = query
 
     if include_unsplash:
-        dataset_object = _datasets["unsplash-25k"]
-        matches: Matches = dataset_object.index.search(vector, count)
-        ids = matches.keys.flatten()
-        uris: List[str] = [str(dataset_object.uris[id]) for id in ids]
-        distances = matches.distances.flatten()
+        dataset_object = _get_dataset("unsplash-25k")
+        matches: Matches = dataset_object.batcher.search(vector, count, expansion)
+        ids = matches.keys.flatten()[:count]
+        uris: List[str] = dataset_object.lookup(ids)
+        distances = matches.distances.flatten()[:count]
         uris_and_distances.extend(list(zip(uris, distances)))
 
     if include_cc:
-        dataset_object = _datasets["cc-3m"]
-        matches: Matches = dataset_object.index.search(vector, count)
-        ids = matches.keys.flatten()
-        uris: List[str] = [str(dataset_object.uris[id]) for id in ids]
-        distances = matches.distances.flatten()
+        dataset_object = _get_dataset("cc-3m")
+        matches: Matches = dataset_object.batcher.search(vector, count, expansion)
+        ids = matches.keys.flatten()[:count]
+        uris: List[str] = dataset_object.lookup(ids)
+        distances = matches.distances.flatten()[:count]
         uris_and_distances.extend(list(zip(uris, distances)))
 
     if include_laion:
-        dataset_object = _datasets["laion-4m"]
-        matches: Matches = dataset_object.index.search(vector, count)
-        ids = matches.keys.flatten()
-        uris: List[str] = [str(dataset_object.uris[id]) for id in ids]
-        distances = matches.distances.flatten()
+        dataset_object = _get_dataset("laion-4m")
+        matches: Matches = dataset_object.batcher.search(vector, count, expansion)
+        ids = matches.keys.flatten()[:count]
+        uris: List[str] = dataset_object.lookup(ids)
+        distances = matches.distances.flatten()[:count]
         uris_and_distances.extend(list(zip(uris, distances)))
 
     uris_and_distances.sort(key=lambda x: x[1])
@@ -115,11 +536,11 @@ def size(
     """Number of entries in the index"""
     total = 0
     if include_unsplash:
-        total += len(_datasets["unsplash-25k"].index)
+        total += len(_get_dataset("unsplash-25k").index)
     if include_cc:
-        total += len(_datasets["cc-3m"].index)
+        total += len(_get_dataset("cc-3m").index)
     if include_laion:
-        total += len(_datasets["laion-4m"].index)
+        total += len(_get_dataset("laion-4m").index)
     return total
 
 
@@ -134,26 +555,26 @@ def sample_images(
     probabilities_across_all = []
 
     if include_unsplash:
-        dataset = _datasets["unsplash-25k"]
+        dataset = _get_dataset("unsplash-25k")
         size = len(dataset.index)
         indexes = np.random.randint(0, size, count)
-        images = [str(dataset.uris[i]) for i in indexes]
+        images = dataset.lookup(indexes)
         candidates_across_all.extend(images)
         probabilities_across_all.extend([1 / size] * count)
 
     if include_cc:
-        dataset = _datasets["cc-3m"]
+        dataset = _get_dataset("cc-3m")
         size = len(dataset.index)
         indexes = np.random.randint(0, size, count)
-        images = [str(dataset.uris[i]) for i in indexes]
+        images = dataset.lookup(indexes)
         candidates_across_all.extend(images)
         probabilities_across_all.extend([1 / size] * count)
 
     if include_laion:
-        dataset = _datasets["laion-4m"]
+        dataset = _get_dataset("laion-4m")
         size = len(dataset.index)
         indexes = np.random.randint(0, size, count)
-        images = [str(dataset.uris[i]) for i in indexes]
+        images = dataset.lookup(indexes)
         candidates_across_all.extend(images)
         probabilities_across_all.extend([1 / size] * count)
 
@@ -172,6 +593,28 @@ def find_with_vector(dataset: str, query: str, count: int) -> List[str]:
     return find_vector(dataset, _ascii_to_vector(query), count)
 
 
+def find_with_vector_bf16(
+    query: bytes,
+    count: int,
+    include_unsplash: bool = True,
+    include_cc: bool = True,
+    include_laion: bool = True,
+    expansion: int = _default_expansion,
+) -> List[str]:
+    """For the given `query` vector of raw `bfloat16` bytes returns the URIs of the most similar images"""
+    # BFloat16 is just the upper half of a `float32`, so widening is a shift
+    halves = np.frombuffer(query, dtype="<u2")
+    vector = (halves.astype(np.uint32) << 16).view(np.float32)
+    return find_vector(
+        vector,
+        count,
+        include_unsplash=include_unsplash,
+        include_cc=include_cc,
+        include_laion=include_laion,
+        expansion=expansion,
+    )
+
+
 def find_with_text(
     query: str,
     count: int,
@@ -179,6 +622,7 @@ def find_with_text(
     include_unsplash: bool = True,
     include_cc: bool = True,
     include_laion: bool = True,
+    expansion: int = _default_expansion,
 ) -> List[str]:
     """For the given `query` string returns the URIs of the most similar images"""
     if query is None or len(query) == 0:
@@ -189,28 +633,31 @@ def find_with_text(
             include_laion=include_laion,
         )
 
-    text_data = _model.preprocess_text(query)
-    text_embedding = _model.encode_text(text_data).detach().numpy()
+    text_embedding = _embed_text(query)
     uris = find_vector(
         text_embedding,
         count,
         include_unsplash=include_unsplash,
         include_cc=include_cc,
         include_laion=include_laion,
+        expansion=expansion,
+        normalized=True,
     )
 
     if rerank:
+        text_data = _model.preprocess_text(query)
         reranked = []
         for uri in uris:
             try:
                 data: str = re.sub("^data:image/.+;base64,", "", uri)
                 image = Image.open(io.BytesIO(base64.b64decode(data)))
-                image_data = _model.preprocess_image(image)
-                joint_embeddings = _model.encode_multimodal(
-                    image=image_data,
-                    text=text_data,
-                )
-                score = float(_model.get_matching_scores(joint_embeddings))
+                image_data = _preprocess_image(image)
+                with torch.inference_mode():
+                    joint_embeddings = _model.encode_multimodal(
+                        image=image_data,
+                        text=text_data,
+                    )
+                    score = float(_model.get_matching_scores(joint_embeddings))
                 reranked.append((uri, score))
             except:
                 pass
@@ -227,22 +674,25 @@ def find_with_image(
     include_unsplash: bool = True,
     include_cc: bool = True,
     include_laion: bool = True,
+    expansion: int = _default_expansion,
 ) -> List[str]:
     """For the given `query` image returns the URIs of the most similar images"""
-    image_data = _model.preprocess_image(query)
-    image_embedding = _model.encode_image(image_data).detach().numpy()
+    image_data = _preprocess_image(query)
+    image_embedding = _encode_image(image_data)
     return find_vector(
         image_embedding,
         count,
         include_unsplash=include_unsplash,
         include_cc=include_cc,
         include_laion=include_laion,
+        expansion=expansion,
     )[:count]
 
 
 if __name__ == "__main__":
     server = Server()
     server(find_with_vector)
+    server(find_with_vector_bf16)
     server(find_with_text)
     server(find_with_image)
     server(size)
@@ -1,4 +1,9 @@
 #!/usr/bin/sh -x
-python3 server.py &
+# Keep the threads and the index memory on one NUMA node, if `numactl` is available
+if command -v numactl > /dev/null; then
+    numactl --cpunodebind=0 --membind=0 python3 server.py &
+else
+    python3 server.py &
+fi
 bg
 disown -h
@@ -1,12 +1,13 @@
 import io
 import os
-import json
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 import numpy as np
 import streamlit as st
 import PIL as pil
 
+from examples import load_examples_by_language, load_examples_vectors
+
 
 # Set Streamlit page configuration
 st.set_page_config(
@@ -93,15 +94,16 @@ def get_backend():
 @st.cache_resource
 def get_examples_by_language() -> Dict[str, List[str]]:
     """Load language examples from JSON."""
-    with open("assets/examples_by_language.json") as f:
-        return json.load(f)
+    return load_examples_by_language()
 
 
 @st.cache_resource
-def get_examples_vectors() -> Dict[str, np.ndarray]:
-    """Load example vectors from JSON."""
-    with open("assets/examples_vectors.json") as f:
-        return json.load(f)
+def get_examples_vectors() -> Tuple[np.ndarray, Dict[str, int]]:
+    """Load example vectors into one matrix, and map queries to its rows."""
+    names, matrix = load_examples_vectors()
+    matrix.setflags(write=False)
+    rows = {name: i for i, name in enumerate(names)}
+    return matrix, rows
 
 
 def unwrap_response(resp):
@@ -112,7 +114,7 @@ def unwrap_response(resp):
 # Initialize primary variables
 backend = get_backend()
 examples_by_language = get_examples_by_language()
-examples_vectors = get_examples_vectors()
+examples_vectors, examples_rows = get_examples_vectors()
 
 # Sidebar configuration settings
 search_kind: str = st.sidebar.radio(
@@ -123,6 +125,9 @@ search_kind: str = st.sidebar.radio(
 columns: int = st.sidebar.slider("Grid Columns", min_value=1, max_value=10, value=8)
 max_rows: int = st.sidebar.slider("Max Rows", min_value=1, max_value=8, value=3)
 rerank: bool = st.sidebar.checkbox("Rerank", value=True)
+expansion: int = st.sidebar.slider(
+    "Search Expansion", min_value=8, max_value=256, value=32
+)
 
 ## 200 lines of Python to build a multi-modal search backend using USearch, UCall, and UForm - AI models so small - they can run in the browser
 
@@ -216,17 +221,19 @@ with st.spinner(f"We are searching through {size:,} entries"):
                 include_unsplash=include_unsplash,
                 include_cc=include_cc,
                 include_laion=include_laion,
+                expansion=expansion,
             )
         )
     # Avoid AI inference if we can :)
-    elif text_query in examples_vectors.keys():
+    elif text_query in examples_rows:
         results = unwrap_response(
             backend.find_vector(
-                vector=np.array(examples_vectors[text_query]),
+                vector=examples_vectors[examples_rows[text_query]],
                 count=max_results,
                 include_unsplash=include_unsplash,
                 include_cc=include_cc,
                 include_laion=include_laion,
+                expansion=expansion,
             )
         )
     else:
@@ -238,6 +245,7 @@ with st.spinner(f"We are searching through {size:,} entries"):
                 include_unsplash=include_unsplash,
                 include_cc=include_cc,
                 include_laion=include_laion,
+                expansion=expansion,
             )
         )
 
@@ -0,0 +1,79 @@
+"""Generates `images_thumb.txt` with small square WebP previews for every line of `images.txt`.
+
+    python thumbnails.py /data/unsplash-25k
+    python thumbnails.py /data/cc-3m https://example.com/cc-3m/thumbnails
+
+Images already inlined as Base64 data-URIs get their previews inlined the same way.
+Linked images are downloaded, and their previews are written to the `thumbnails`
+subdirectory, to be served from the given base URL. Without a base URL, and for
+images that fail to download or decode, the original URI is kept.
+"""
+import io
+import os
+import re
+import sys
+import base64
+import urllib.request
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+
+def make_thumbnail(data: bytes, size: int = 256, quality: int = 80) -> bytes:
+    """Decodes the image and returns a square WebP preview"""
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    # The UI crops every result to a square anyway
+    image = ImageOps.fit(image, (size, size), Image.BICUBIC)
+    buffer = io.BytesIO()
+    image.save(buffer, "webp", quality=quality)
+    return buffer.getvalue()
+
+
+def process(dir: os.PathLike, base_url: Optional[str], key: int, uri: str) -> str:
+    """Returns the preview URI for the image at `uri`, or the `uri` itself"""
+    try:
+        if uri.startswith("data:"):
+            data = base64.b64decode(re.sub("^data:image/.+;base64,", "", uri))
+            preview = base64.b64encode(make_thumbnail(data)).decode()
+            return "data:image/webp;base64," + preview
+
+        if base_url is None:
+            return uri
+        with urllib.request.urlopen(uri, timeout=10) as response:
+            data = response.read()
+        with open(os.path.join(dir, "thumbnails", f"{key}.webp"), "wb") as f:
+            f.write(make_thumbnail(data))
+        return f"{base_url.rstrip('/')}/{key}.webp"
+    except Exception:
+        return uri
+
+
+def main(
+    dir: os.PathLike,
+    base_url: Optional[str] = None,
+    threads: int = 64,
+    batch_size: int = 10_000,
+):
+    with open(os.path.join(dir, "images.txt")) as f:
+        uris = f.read().splitlines()
+    print(f"Generating {len(uris):,} thumbnails for: {dir}")
+    os.makedirs(os.path.join(dir, "thumbnails"), exist_ok=True)
+
+    with ThreadPoolExecutor(threads) as executor, open(
+        os.path.join(dir, "images_thumb.txt"), "w"
+    ) as f:
+        for start in range(0, len(uris), batch_size):
+            batch = uris[start : start + batch_size]
+            keys = range(start, start + len(batch))
+            previews = executor.map(
+                lambda key, uri: process(dir, base_url, key, uri), keys, batch
+            )
+            for preview in previews:
+                f.write(preview)
+                f.write("\n")
+            print(f"- processed {start + len(batch):,} images")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:3])